@@ -0,0 +1,288 @@
+"""Benchmarks for the endpoints in Server.py.
+
+The benchmark never touches test.db: it points the app at a scratch SQLite
+file, fills it with datagen.py, and times the endpoints.
+
+    python bench.py routes --members 100000 --orders 1000000
+    python bench.py routes --save before.json
+    python bench.py routes --baseline before.json   # exit 1 on regressions
+    python bench.py repurchase
+    python bench.py rfm
+    python bench.py indexes
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, text
+
+import datagen
+from Server import create_app, db, Order, OrderProduct, ProductMaterial, response_cache, \
+    upgrade_schema
+
+# The app under test, created by use_database()
+app = None
+
+
+def use_database(path):
+    global app
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + path})
+    with app.app_context():
+        db.create_all()
+
+
+# The per-member implementation /repurchase-rate used before it was rewritten
+def legacy_repurchase_rate():
+    one_year_ago = datetime.today() - timedelta(days = 365)
+    two_year_ago = datetime.today() - timedelta(days = 730)
+    last_year_orders = Order.query.filter(Order.date >= two_year_ago, Order.date <= one_year_ago).group_by(Order.member_id).all()
+    member_id_list = [order.member_id for order in last_year_orders]
+    count = 0
+    for member_id in member_id_list:
+        if Order.query.filter(Order.date >= one_year_ago, Order.member_id == member_id).first():
+            count += 1
+    return count / len(member_id_list)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def bench_repurchase(args):
+    client = app.test_client()
+    new_time, response = timed(lambda: client.get('/repurchase-rate'))
+    print("set-based query: %.3fs -> %s" % (new_time, response.get_json()))
+    if args.skip_legacy:
+        return
+    with app.app_context():
+        legacy_time, legacy_rate = timed(legacy_repurchase_rate)
+    print("per-member loop: %.3fs -> %s" % (legacy_time, legacy_rate))
+    print("speedup: %.1fx" % (legacy_time / new_time))
+
+
+def bench_rfm(args):
+    client = app.test_client()
+    for url in ('/rfm', '/rfm?tiers=5,5,5'):
+        elapsed, response = timed(lambda: client.get(url))
+        print("%s: %.3fs, %d members returned"
+              % (url, elapsed, len(response.get_json())))
+
+
+PLAN_QUERIES = {
+    "orders of one member":
+        'SELECT * FROM "order" WHERE member_id = 42',
+    "orders of the last year":
+        'SELECT member_id, count(*), max(date) FROM "order" '
+        "WHERE date >= datetime('now', '-365 days') GROUP BY member_id",
+    "orders page ordered by date":
+        'SELECT * FROM "order" WHERE date > datetime(\'now\', \'-100 days\') '
+        'ORDER BY date, order_id LIMIT 11',
+}
+
+INDEX_URLS = ['/order/mid=42', '/active-rate', '/repurchase-rate',
+              '/order/page?per_page=10']
+
+
+def report_plans_and_latency(client):
+    with app.app_context():
+        for name, sql in PLAN_QUERIES.items():
+            plan = db.session.execute(text('EXPLAIN QUERY PLAN ' + sql)).fetchall()
+            elapsed, _ = timed(lambda: db.session.execute(text(sql)).fetchall())
+            print("  %-28s %8.1fms  %s" % (name, elapsed * 1000,
+                                           ' / '.join(row[-1] for row in plan)))
+    for url in INDEX_URLS:
+        with app.app_context():
+            response_cache.clear()
+        elapsed, _ = timed(lambda: client.get(url).get_data())
+        print("  GET %-24s %8.1fms" % (url, elapsed * 1000))
+
+
+def bench_indexes(args):
+    client = app.test_client()
+    with app.app_context():
+        for table in (Order.__table__, OrderProduct.__table__, ProductMaterial.__table__):
+            for index in table.indexes:
+                index.drop(db.engine)
+    print("without indexes:")
+    report_plans_and_latency(client)
+    with app.app_context():
+        elapsed, steps = timed(upgrade_schema)
+    print("upgrade-db: %.1fs (%s)" % (elapsed, ', '.join(steps)))
+    print("with indexes:")
+    report_plans_and_latency(client)
+
+
+BULK_ROWS = 1000
+
+
+def member_rows(rng, args):
+    return [{"member_name": "bench%d" % i, "sex": rng.choice("MF"), "age": rng.randint(18, 80)}
+            for i in range(BULK_ROWS)]
+
+
+def order_rows(rng, args):
+    return [{"member_id": rng.randint(1, args.members), "total_amount": rng.randint(100, 10000),
+             "date": (datetime.today() - timedelta(days=rng.randint(0, 700))).strftime('%Y-%m-%d')}
+            for _ in range(BULK_ROWS)]
+
+
+def order_with_lines(rng, args):
+    return {"member_id": rng.randint(1, args.members),
+            "date": datetime.today().strftime('%Y-%m-%d'),
+            "order_products": [{"product_id": rng.randint(1, args.products), "quantity": 1}
+                               for _ in range(3)]}
+
+
+def product_changes(rng, args):
+    return [{"product_id": rng.randint(1, args.products), "price": rng.randint(1, 1000)}
+            for _ in range(BULK_ROWS)]
+
+
+def demand_plan(rng, args):
+    return {"demand": {str(product_id): {str(period): rng.randint(0, 50) for period in range(1, 9)}
+                       for product_id in range(1, min(args.products, BULK_ROWS) + 1)}}
+
+
+# (method, url, JSON body factory or None); {order_id} and {member_id} are
+# filled with a random existing id for every request
+ROUTES = [
+    ('GET', '/rfm', None),
+    ('GET', '/rfm?tiers=5,5,5', None),
+    ('GET', '/active-rate', None),
+    ('GET', '/repurchase-rate', None),
+    ('GET', '/ssale', None),
+    ('GET', '/ssale/rollup?granularity=month', None),
+    ('GET', '/member/{member_id}', None),
+    ('GET', '/member/page?per_page=100', None),
+    ('GET', '/order/page?per_page=100', None),
+    ('GET', '/products/page?per_page=100', None),
+    ('GET', '/order/mid={member_id}', None),
+    ('GET', '/order/{order_id}/detail', None),
+    ('GET', '/reorder-points', None),
+    ('POST', '/reorder-points', None),
+    ('POST', '/mrp', demand_plan),
+    ('POST', '/order', order_with_lines),
+    ('POST', '/member/bulk', member_rows),
+    ('POST', '/order/bulk', order_rows),
+    ('POST', '/products/bulk', product_changes),
+]
+
+
+def run_route(client, rng, args, method, url, body):
+    url = url.format(member_id=rng.randint(1, args.members), order_id=rng.randint(1, args.orders))
+    data = body(rng, args) if body else None
+    # measure the work, not the response cache
+    with app.app_context():
+        response_cache.clear()
+    response = client.open(url, method=method, json=data)
+    response.get_data()
+    if response.status_code >= 400:
+        raise RuntimeError("%s %s -> %d" % (method, url, response.status_code))
+
+
+def bench_routes(args):
+    client = app.test_client()
+    rng = random.Random(0)
+    queries = [0]
+
+    def count_query(*_):
+        queries[0] += 1
+
+    with app.app_context():
+        event.listen(db.engine, 'after_cursor_execute', count_query)
+    results = {}
+    for method, url, body in ROUTES:
+        name = '%s %s' % (method, url)
+        latencies = []
+        queries[0] = 0
+        for _ in range(args.repeat):
+            elapsed, _ = timed(lambda: run_route(client, rng, args, method, url, body))
+            latencies.append(elapsed)
+        query_count = queries[0] / args.repeat
+        # tracemalloc slows everything down, so memory is measured in a separate run
+        tracemalloc.start()
+        run_route(client, rng, args, method, url, body)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[name] = {"median_ms": statistics.median(latencies) * 1000,
+                         "max_ms": max(latencies) * 1000,
+                         "queries": query_count, "peak_mib": peak / 2 ** 20}
+        print("  %-40s %9.1fms median %9.1fms max %7.1f queries %8.1f MiB"
+              % (name, results[name]["median_ms"], results[name]["max_ms"],
+                 query_count, results[name]["peak_mib"]))
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.tolerance)
+        for line in regressions:
+            print("REGRESSION " + line)
+        if regressions:
+            sys.exit(1)
+
+
+# Differences below these are noise on fast routes
+MIN_REGRESSION = {'median_ms': 2.0, 'peak_mib': 1.0}
+
+
+# A route regresses when it is slower or uses more memory than the baseline
+# by more than `tolerance`, or runs more queries
+def compare(baseline, results, tolerance):
+    regressions = []
+    for name, result in sorted(results.items()):
+        before = baseline.get(name)
+        if before is None:
+            continue
+        for key, minimum in MIN_REGRESSION.items():
+            if result[key] > max(before[key] * (1 + tolerance), before[key] + minimum):
+                regressions.append("%s: %s %.1f -> %.1f" % (name, key, before[key], result[key]))
+        if result['queries'] > before['queries']:
+            regressions.append("%s: queries %.1f -> %.1f"
+                               % (name, before['queries'], result['queries']))
+    return regressions
+
+
+BENCHMARKS = {
+    'indexes': bench_indexes,
+    'repurchase': bench_repurchase,
+    'rfm': bench_rfm,
+    'routes': bench_routes,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('--members', type=int, default=100000)
+    parser.add_argument('--orders', type=int, default=1000000)
+    parser.add_argument('--products', type=int, default=1000)
+    parser.add_argument('--skip-legacy', action='store_true',
+                        help="only time the current implementation")
+    parser.add_argument('--repeat', type=int, default=5, help="requests per route")
+    parser.add_argument('--save', help="write the routes results to this JSON file")
+    parser.add_argument('--baseline', help="compare the routes results with this JSON file")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        use_database(os.path.join(tmp, 'bench.db'))
+        elapsed = datagen.generate(app, args.members, args.orders, args.products)
+        print("generated %d members / %d orders / %d products in %.1fs"
+              % (args.members, args.orders, args.products, elapsed))
+        BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == '__main__':
+    main()
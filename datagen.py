@@ -0,0 +1,169 @@
+"""Generate a synthetic database: members, seasonal orders with line items,
+products, materials and bills of materials.
+
+Rows are written as plain tuples with executemany in chunks, bypassing
+SQLAlchemy's per-row parameter processing, and the secondary indexes are
+built once after loading. The derived
+tables (member_stats, member.monetary, season_sale) are rebuilt from the
+orders, so every endpoint sees consistent data.
+
+    python datagen.py /tmp/big.db --members 100000 --orders 1000000
+    python datagen.py /tmp/huge.db --members 1000000 --orders 10000000 --products 50000
+"""
+import argparse
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from Server import create_app, db, Member, Order, OrderProduct, Product, Material, \
+    ProductMaterial, rebuild_member_stats, rebuild_season_sales, reconcile_member_monetary
+
+CHUNK_SIZE = 50000
+
+# Relative sales per month: a mid-year sale and a year-end peak
+MONTH_WEIGHTS = (0.8, 0.7, 0.9, 0.9, 1.0, 1.2, 1.1, 1.0, 0.9, 1.0, 1.4, 1.8)
+
+
+def chunks(count):
+    for start in range(0, count, CHUNK_SIZE):
+        yield start, min(start + CHUNK_SIZE, count)
+
+
+# rows are tuples in the order of columns; dates must already be strings
+# in the format SQLAlchemy stores in SQLite
+def insert(table, columns, rows):
+    sql = 'INSERT INTO "%s" (%s) VALUES (%s)' % (
+        table.name, ', '.join(columns), ', '.join('?' * len(columns)))
+    db.session.connection().exec_driver_sql(sql, rows)
+
+
+def order_days(days, today):
+    """The last `days` days with cumulative sales weights: a monthly season,
+    busier weekends and slow growth towards today."""
+    dates = [today - timedelta(days=offset) for offset in range(days)]
+    weights = accumulate(MONTH_WEIGHTS[date.month - 1] * (1.3 if date.weekday() >= 5 else 1.0)
+                         * (1 + 0.5 * (days - offset) / days)
+                         for offset, date in enumerate(dates))
+    return [date.strftime('%Y-%m-%d') for date in dates], list(weights)
+
+
+def generate_members(rng, members):
+    for start, end in chunks(members):
+        insert(Member.__table__, ('member_name', 'sex', 'age', 'monetary'), [
+            ("member%d" % i, rng.choice("MF"), min(90, max(18, int(rng.gauss(38, 12)))), 0)
+            for i in range(start + 1, end + 1)])
+
+
+def generate_catalog(rng, products, materials, components):
+    insert(Material.__table__, ('material_name',),
+           [("material%d" % i,) for i in range(1, materials + 1)])
+    for start, end in chunks(products):
+        insert(Product.__table__, ('product_name', 'price', 'on_hand_balance', 'leading_time',
+                                   'reorder_point'), [
+            # log-normal prices: most products are cheap, a few expensive
+            ("product%d" % i, max(1, int(rng.lognormvariate(5, 1))), rng.randint(0, 500),
+             rng.randint(1, 30), 0)
+            for i in range(start + 1, end + 1)])
+    # about `components` materials per product; a repeated material means
+    # the product needs more than one of it
+    for start, end in chunks(products):
+        insert(ProductMaterial.__table__, ('product_id', 'material_id'), [
+            (product_id, rng.randint(1, materials))
+            for product_id in range(start + 1, end + 1)
+            for _ in range(max(1, int(rng.expovariate(1 / components))))])
+
+
+def generate_orders(rng, members, orders, products, days, lines_per_order):
+    prices = [price for price, in db.session.query(Product.price).order_by(Product.product_id)]
+    hours = [' %02d:00:00.000000' % hour for hour in range(8, 23)]
+    dates, date_weights = order_days(days, datetime.today())
+    # A few loyal members and best sellers take most of the orders.
+    # Cumulative weights are built once, rng.choices() would redo it per call
+    member_ids = range(1, members + 1)
+    member_weights = list(accumulate(1 / math.sqrt(i) for i in member_ids))
+    product_ids = range(1, products + 1)
+    product_weights = list(accumulate(1 / i for i in product_ids))
+    order_id = 0
+    for start, end in chunks(orders):
+        count = end - start
+        order_rows = []
+        line_rows = []
+        for member_id, date in zip(rng.choices(member_ids, cum_weights=member_weights, k=count),
+                                   rng.choices(dates, cum_weights=date_weights, k=count)):
+            order_id += 1
+            total = 0
+            lines = max(1, int(rng.expovariate(1 / lines_per_order)))
+            for product_id in rng.choices(product_ids, cum_weights=product_weights, k=lines):
+                quantity = rng.randint(1, 5)
+                unit_price = prices[product_id - 1]
+                total += quantity * unit_price
+                line_rows.append((order_id, product_id, quantity, unit_price))
+            order_rows.append((order_id, member_id, total, date + rng.choice(hours)))
+        insert(Order.__table__, ('order_id', 'member_id', 'total_amount', 'date'), order_rows)
+        insert(OrderProduct.__table__, ('order_id', 'product_id', 'quantity', 'unit_price'),
+               line_rows)
+
+
+def without_indexes(tables, func, *args):
+    """Run func with the tables' secondary indexes dropped and rebuild them
+    afterwards: one sorted index build is much cheaper than keeping the
+    indexes up to date on every random insert."""
+    indexes = [index for table in tables for index in table.indexes]
+    for index in indexes:
+        index.drop(db.engine)
+    func(*args)
+    db.session.commit()
+    for index in indexes:
+        index.create(db.engine)
+
+
+def generate(app, members, orders, products=1000, materials=200, components=4,
+             days=730, lines_per_order=2, seed=0, log=print):
+    """Fill an empty database created by init-db; returns the elapsed seconds."""
+    rng = random.Random(seed)
+    start = time.perf_counter()
+
+    def step(name, func, *args):
+        begin = time.perf_counter()
+        func(*args)
+        db.session.commit()
+        log("  %-18s %6.1fs" % (name, time.perf_counter() - begin))
+
+    with app.app_context():
+        step("members", generate_members, rng, members)
+        step("catalog", without_indexes, [ProductMaterial.__table__],
+             generate_catalog, rng, products, materials, components)
+        step("orders", without_indexes, [Order.__table__, OrderProduct.__table__],
+             generate_orders, rng, members, orders, products, days, lines_per_order)
+        step("member_stats", rebuild_member_stats)
+        step("monetary", reconcile_member_monetary)
+        step("season_sale", rebuild_season_sales)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', help="SQLite file to create")
+    parser.add_argument('--members', type=int, default=10000)
+    parser.add_argument('--orders', type=int, default=100000)
+    parser.add_argument('--products', type=int, default=1000)
+    parser.add_argument('--materials', type=int, default=200)
+    parser.add_argument('--components', type=int, default=4,
+                        help="average materials per product")
+    parser.add_argument('--days', type=int, default=730, help="order history length")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + args.path})
+    with app.app_context():
+        db.create_all()
+    elapsed = generate(app, args.members, args.orders, args.products, args.materials,
+                       args.components, args.days, seed=args.seed)
+    print("generated %d members / %d orders / %d products in %.1fs"
+          % (args.members, args.orders, args.products, elapsed))
+
+
+if __name__ == '__main__':
+    main()
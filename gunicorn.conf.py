@@ -0,0 +1,25 @@
+# gunicorn -c gunicorn.conf.py wsgi:app
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+# 每個 worker 再開幾條執行緒，I/O 等待時可以處理其他請求
+threads = int(os.environ.get('THREADS', 4))
+worker_class = 'gthread'
+timeout = int(os.environ.get('TIMEOUT', 120))
+# 不預先載入 app，讓每個 worker 各自建立資料庫連線
+preload_app = False
+# ACCESS_LOG= (空字串) 可關閉存取紀錄
+accesslog = os.environ.get('ACCESS_LOG', '-') or None
+
+# 回應快取預設存在各 worker 程序內，寫入時只會清除處理該請求的 worker，
+# 其他 worker 會繼續回傳舊資料直到過期。多個 worker 又沒有設定 CACHE_REDIS_URL 時關閉快取
+cache_disabled = workers > 1 and not os.environ.get('CACHE_REDIS_URL')
+if cache_disabled:
+    os.environ['CACHE_MAX_ENTRIES'] = '0'
+
+
+def on_starting(server):
+    if cache_disabled:
+        server.log.warning("%d workers without CACHE_REDIS_URL: response cache disabled", workers)
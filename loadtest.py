@@ -0,0 +1,84 @@
+"""Load test against a running server, reporting requests per second.
+
+Start the server first (``python Server.py`` for the debug server,
+``gunicorn -c gunicorn.conf.py wsgi:app`` for production) and compare:
+
+    python loadtest.py http://127.0.0.1:5000 /member/1 /rfm /active-rate
+    python loadtest.py http://127.0.0.1:5000 /member/1 --write-ratio 0.2
+
+With --write-ratio, that share of requests POST a small order for member 1
+so readers and writers contend for the database.
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from datetime import datetime
+
+
+def worker(base_url, paths, write_ratio, deadline, results, lock):
+    latencies = []
+    errors = Counter()
+    count = 0
+    order = json.dumps({"member_id": 1, "total_amount": 1,
+                        "date": datetime.today().strftime('%Y-%m-%d')}).encode()
+    while time.perf_counter() < deadline:
+        count += 1
+        if write_ratio and count % round(1 / write_ratio) == 0:
+            req = urllib.request.Request(base_url + '/order', data=order, method='POST',
+                                         headers={'Content-Type': 'application/json'})
+        else:
+            req = urllib.request.Request(base_url + paths[count % len(paths)])
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req) as response:
+                response.read()
+        except urllib.error.HTTPError as error:
+            errors['HTTP %d' % error.code] += 1
+        except (urllib.error.URLError, ConnectionError) as error:
+            errors[type(error).__name__] += 1
+        latencies.append(time.perf_counter() - start)
+    with lock:
+        results['latencies'].extend(latencies)
+        results['errors'].update(errors)
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('base_url')
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--write-ratio', type=float, default=0)
+    args = parser.parse_args()
+
+    results = {'latencies': [], 'errors': Counter()}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+    threads = [threading.Thread(target=worker, args=(args.base_url.rstrip('/'), args.paths,
+                                                     args.write_ratio, deadline, results, lock))
+               for _ in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies = sorted(results['latencies'])
+    errors = results['errors']
+    print("requests: %d, errors: %d %s" % (len(latencies), sum(errors.values()),
+                                          dict(errors) if errors else ''))
+    print("requests/s: %.1f" % (len(latencies) / args.duration))
+    if latencies:
+        print("latency p50 %.1fms, p95 %.1fms, p99 %.1fms" % tuple(
+            percentile(latencies, fraction) * 1000 for fraction in (0.5, 0.95, 0.99)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Measure worker cold start: a fresh interpreter importing Server and
+calling create_app(), which is what every gunicorn worker does on boot.
+
+    python startup_time.py                 # median boot time + slowest imports
+    python startup_time.py --target 800    # exit 1 when boot is slower (ms)
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+BOOT = "import Server; Server.create_app()"
+
+
+def boot_time():
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', BOOT], check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+# -X importtime lines look like "import time:  self [us] | cumulative | package"
+def slowest_imports(limit):
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', BOOT], check=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            text=True).stderr
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, package = line[len('import time:'):].split('|')
+        # nesting is shown by two extra spaces per level; keep the modules
+        # Server imports directly, deeper ones are already in their parent's time
+        depth = (len(package) - len(package.lstrip())) // 2
+        if depth == 1 or package.strip() == 'Server':
+            imports.append((int(cumulative), package.strip()))
+    return sorted(imports, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--target', type=float, help="maximum boot time in ms")
+    args = parser.parse_args()
+
+    elapsed = statistics.median(boot_time() for _ in range(args.runs)) * 1000
+    print("boot time (median of %d): %.0fms" % (args.runs, elapsed))
+    print("slowest imports made by Server:")
+    for cumulative, package in slowest_imports(args.top):
+        print("  %8.1fms  %s" % (cumulative / 1000, package))
+    if args.target is not None and elapsed > args.target:
+        print("over the %.0fms target" % args.target)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+"""Production entry point.
+
+Serve the app with a multi-worker WSGI server instead of the debug server
+started by ``python Server.py``:
+
+    gunicorn -c gunicorn.conf.py wsgi:app     (Linux / macOS)
+    python wsgi.py                            (any OS, needs waitress)
+
+Database and pool settings come from the environment, see Server.py
+(DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, SQLITE_BUSY_TIMEOUT, ...).
+"""
+import os
+
+from Server import create_app
+
+app = create_app()
+
+if __name__ == '__main__':
+    from waitress import serve
+
+    serve(app, host=os.environ.get('HOST', '0.0.0.0'),
+          port=int(os.environ.get('PORT', 5000)),
+          threads=int(os.environ.get('THREADS', 8)))